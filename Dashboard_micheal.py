@@ -1,12 +1,25 @@
 import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash import dcc, html, Patch
+from dash.dependencies import Input, Output, State, MATCH, ALL
+from dash.exceptions import PreventUpdate
+from flask_caching import Cache
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import plotly.express as px
+import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 from dash import dash_table
+from collections import namedtuple
+from functools import lru_cache
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+import urllib.request
 
 # Get the absolute path to the directory where the script is located
 base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,6 +34,72 @@ data_paths = {
 }
 
 
+def cache_version():
+    # Latest modification time of the input CSVs plus a hash of this file, so both edited data files
+    # and deploys that change how tables and pies are built get a fresh cache directory
+    data_mtime = max(entry.stat().st_mtime_ns for path in data_paths.values()
+                     for entry in os.scandir(path) if entry.name.endswith('.csv'))
+    with open(__file__, 'rb') as f:
+        code_hash = hashlib.sha1(f.read()).hexdigest()[:12]
+    return f"{data_mtime}-{code_hash}"
+
+
+cache_root = os.path.join(tempfile.gettempdir(), 'nitrogen-dashboard-cache')
+cache_dir = os.path.join(cache_root, cache_version())
+
+
+def prune_cache_dirs():
+    # Entries never expire, so drop the directories of older data files or code instead of letting them pile up
+    if os.path.isdir(cache_root):
+        for entry in os.scandir(cache_root):
+            if entry.is_dir() and entry.path != cache_dir:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+prune_cache_dirs()
+
+# Per-year callback results shared by all server workers through a filesystem cache;
+# each worker also keeps its own lru_cache in front so repeat requests skip the disk read
+cache = Cache(app.server, config={
+    'CACHE_TYPE': 'FileSystemCache',
+    'CACHE_DIR': cache_dir,
+    'CACHE_DEFAULT_TIMEOUT': 0
+})
+
+
+# US counties GeoJSON keyed by FIPS code, downloaded once and kept next to the data files
+counties_geojson_url = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
+counties_geojson_path = os.path.join(base_dir, 'data', 'geojson-counties-fips.json')
+
+
+# Seconds to wait on the GeoJSON download before failing instead of hanging at startup
+counties_geojson_timeout = 30
+
+
+def load_counties_geojson():
+    if not os.path.exists(counties_geojson_path):
+        try:
+            with urllib.request.urlopen(counties_geojson_url, timeout=counties_geojson_timeout) as response:
+                content = response.read()
+        except OSError as e:
+            raise RuntimeError(f"Could not download the counties GeoJSON from {counties_geojson_url}; "
+                               f"download it manually to {counties_geojson_path}") from e
+        # Write to a temporary file first so concurrent workers never read a partial download
+        tmp_path = f"{counties_geojson_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, counties_geojson_path)
+        finally:
+            # Never leave a partial download behind if the write or rename failed
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    with open(counties_geojson_path) as f:
+        return json.load(f)
+
+
+counties_geojson = load_counties_geojson()
+
 # Nitrogen loss categories with descriptions
 nitrogen_loss_labels = {
     'nitrogen_loss1': 'N input not taken by crop',
@@ -32,312 +111,357 @@ nitrogen_loss_labels = {
     'nitrogen_loss7': 'Human N waste'
 }
 
+# Nitrogen loss columns per source DataFrame
+crop_nitrogen_cols = ['nitrogen_loss1', 'nitrogen_loss2']
+animal_nitrogen_cols = ['nitrogen_loss3', 'nitrogen_loss4', 'nitrogen_loss5', 'nitrogen_loss6', 'nitrogen_loss7']
+
+# Import/Export/Within County columns per supply chain stage
+crop_trade_cols = ["import_crop_processing_nitrogen", "export_crop_processing_nitrogen",
+                   "within_county_crop_processing_nitrogen"]
+animal_trade_cols = ["import_animal_nitrogen", "export_animal_nitrogen", "within_county_animal_nitrogen"]
+meat_trade_cols = ["import_meat_nitrogen", "export_meat_nitrogen", "within_county_meat_nitrogen"]
+
+# Within county flows are stored as "selfloop_*" columns in the source files
+crop_column_renames = {'selfloop_crop_processing_nitrogen': 'within_county_crop_processing_nitrogen'}
+animal_column_renames = {'selfloop_animal_nitrogen': 'within_county_animal_nitrogen',
+                         'selfloop_meat_nitrogen': 'within_county_meat_nitrogen'}
+
+# USPS codes by state FIPS code, used by the state overview map
+state_postal_codes = {
+    '01': 'AL', '02': 'AK', '04': 'AZ', '05': 'AR', '06': 'CA', '08': 'CO', '09': 'CT', '10': 'DE', '11': 'DC',
+    '12': 'FL', '13': 'GA', '15': 'HI', '16': 'ID', '17': 'IL', '18': 'IN', '19': 'IA', '20': 'KS', '21': 'KY',
+    '22': 'LA', '23': 'ME', '24': 'MD', '25': 'MA', '26': 'MI', '27': 'MN', '28': 'MS', '29': 'MO', '30': 'MT',
+    '31': 'NE', '32': 'NV', '33': 'NH', '34': 'NJ', '35': 'NM', '36': 'NY', '37': 'NC', '38': 'ND', '39': 'OH',
+    '40': 'OK', '41': 'OR', '42': 'PA', '44': 'RI', '45': 'SC', '46': 'SD', '47': 'TN', '48': 'TX', '49': 'UT',
+    '50': 'VT', '51': 'VA', '53': 'WA', '54': 'WV', '55': 'WI', '56': 'WY'
+}
 
-# Function to load data based on selected year
-def load_data(year):
-    path = data_paths[year]
-    # Reading CSV files with os.path.join
-    nitrogen_df = pd.read_csv(os.path.join(path, 'nitrogen_losses_summary.csv'))
-    area_df = pd.read_csv(os.path.join(path, 'harvested_area_by_commodity.csv'))
-    inventory_df = pd.read_csv(os.path.join(path, 'inventory_by_commodity.csv'))
-    crop_processing_nitrogen_df = pd.read_csv(os.path.join(path, 'crop_processing_nitrogen.csv'))
-    animal_stage_nitrogen_df = pd.read_csv(os.path.join(path, 'animal_stage_nitrogen.csv'))
-    # Rename columns in crop_processing_nitrogen_df
-    crop_processing_nitrogen_df.columns = [
-        col.replace("selfloop", "within_county") if col.startswith("selfloop") else col
-        for col in crop_processing_nitrogen_df.columns
-    ]
-
-    # Rename columns in animal_stage_nitrogen_df
-    animal_stage_nitrogen_df.columns = [
-        col.replace("selfloop", "within_county") if col.startswith("selfloop") else col
-        for col in animal_stage_nitrogen_df.columns
-    ]
-    # Calculate total nitrogen loss for each DataFrame by summing specified columns
-    crop_processing_nitrogen_df['total_nitrogen_loss'] = crop_processing_nitrogen_df[
-        ['nitrogen_loss1', 'nitrogen_loss2']
-    ].sum(axis=1)
-
-    animal_stage_nitrogen_df['total_nitrogen_loss'] = animal_stage_nitrogen_df[
-        ['nitrogen_loss3', 'nitrogen_loss4', 'nitrogen_loss5', 'nitrogen_loss6', 'nitrogen_loss7']
-    ].sum(axis=1)
-
-    # Combine the total nitrogen loss from both dataframes if necessary
-    total_nitrogen_df = pd.concat([
-        crop_processing_nitrogen_df[['FIPS', 'county', 'total_nitrogen_loss']],
-        animal_stage_nitrogen_df[['FIPS', 'county', 'total_nitrogen_loss']]
-    ]).groupby('FIPS').agg({
-        'total_nitrogen_loss': 'sum',  # Sum the nitrogen loss
-        'county': 'first'  # Keep the first non-null value of the county name
-    }).reset_index()
-
-    return nitrogen_df, area_df, inventory_df, crop_processing_nitrogen_df, animal_stage_nitrogen_df, total_nitrogen_df
+# Per-stage nitrogen loss sums (million kg) and their grand total, computed once per year
+LossTotals = namedtuple('LossTotals', ['crop', 'animal', 'total'])
 
+# Everything load_data prepares for one year
+YearData = namedtuple('YearData', ['nitrogen_df', 'area_df', 'inventory_df', 'crop_df', 'animal_df',
+                                   'total_nitrogen_df', 'loss_totals'])
 
-app.layout = html.Div([
-    # Title
-    html.H1(
-        [
-            html.Span("Impacts of Future Scenarios on Nitrogen Loss from Agricultural Supply Chains",
-                      style={'display': 'block'}),
-            html.Span("in the Chesapeake Bay",
-                      style={'display': 'block'})
-        ],
-        style={'textAlign': 'center', 'fontWeight': 'bold'}
-    ),
 
-    # Text with hyperlink to paper
-    html.P([
-        "The Dashboard has been modeled based on this ",
-        html.A("paper", href="https://www.DOI.org/10.1088/1748-9326/ad5d0b", target="_blank",
-               style={'color': 'blue', 'textDecoration': 'underline'}),
-        "."
-    ], style={'textAlign': 'center', 'fontSize': '16px', 'marginTop': '20px'}),
+# Parse CSVs with pyarrow's multithreaded reader; FIPS stays a string so codes keep any leading zeros
+# and empty strings are read as missing values, as pd.read_csv does
+csv_convert_options = pacsv.ConvertOptions(column_types={'FIPS': pa.string()}, strings_can_be_null=True)
 
-    # Dropdown for Year Selection
-    html.Label(
-        'Select Year',
-        style={'fontWeight': 'bold', 'textAlign': 'center', 'display': 'block', 'marginTop': '20px'}
-    ),
-    dcc.Dropdown(
-        id='year-dropdown',
-        options=[{'label': year, 'value': year} for year in data_paths.keys()],
-        value='2017',
-        style={'width': '50%', 'margin': '0 auto'}
-    ),
 
-    # Table of Contents
-    html.H2("Contents", style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'}),
-    html.Ul([
-        html.Li(html.Span("In What Stage Is Nitrogen Lost in the Food and Animal Supply Chain?",
-                          style={'fontWeight': 'bold', 'fontSize': '18px'})),
-        html.Li(html.Span("Where Does Nitrogen Loss Occur in the Chesapeake Bay?",
-                          style={'fontWeight': 'bold', 'fontSize': '18px'})),
-        html.Li(html.Span("What Are the Production Totals for Crops and Animals in the Chesapeake Bay?",
-                          style={'fontWeight': 'bold', 'fontSize': '18px'}))
-    ], style={'textAlign': 'center', 'listStyleType': 'none', 'padding': 0}),
+def table_to_frame(table):
+    # FIPS codes stay pyarrow-backed strings instead of one Python object per row
+    df = table.to_pandas()
+    if 'FIPS' in df:
+        df['FIPS'] = df['FIPS'].astype('string[pyarrow]')
+    return df
 
-    # Section 1: Nitrogen Loss Maps (Tabs)
-    html.Div(id="chloropleth-maps"),
 
-    # Section 1.1: Nitrogen Loss Table
-    html.H2("Nitrogen Loss Table",
-            style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '20px'}),
-    html.Div(id="nitrogen-loss-table",
-             style={'width': '80%', 'margin': '0 auto'}),
+def read_csv(path):
+    # A zstd Parquet copy is written next to each CSV on first read and used until the CSV changes
+    parquet_path = os.path.splitext(path)[0] + '.parquet'
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+        return table_to_frame(pq.read_table(parquet_path))
 
-    # Section 2: Trade Behavior Maps (Tabs)
-    html.Div(id="import-export-maps"),
+    table = pacsv.read_csv(path, convert_options=csv_convert_options)
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    try:
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, parquet_path)
+    except OSError:
+        pass  # Read-only data directory: keep serving from the CSV
+    finally:
+        # Never leave a partial Parquet copy behind if the write or rename failed
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return table_to_frame(table)
 
-    # Section 2.1: Trade Behavior Tables
-    html.Div(id="import-export-tables",
-             style={'width': '80%', 'margin': '0 auto'}),
 
-    # Section 3: Inventory & Harvested Area (Tabs)
-    html.Div(id="inventory-harvest-section")
-], style={'padding': '20px'})
+def group_sum(codes, values, n_groups):
+    return np.bincount(codes, weights=values, minlength=n_groups)
 
 
+# Optional numba kernels for the per-county and per-commodity sums, enabled with NITROGEN_USE_NUMBA=1
+# (the first call pays the JIT compile)
+use_numba = os.environ.get('NITROGEN_USE_NUMBA') == '1'
+groupby_engine = 'numba' if use_numba else None
+if use_numba:
+    import numba
 
-@app.callback(
-    [
-        Output("chloropleth-maps", "children"),  # Section 1: Nitrogen Loss Maps
-        Output("nitrogen-loss-table", "children"),  # Section 1.1: Nitrogen Loss Table
-        Output("import-export-tables", "children"),  # Section 2.1: Trade Behavior Tables
-        Output("import-export-maps", "children"),  # Section 2: Trade Behavior Maps
-        Output("inventory-harvest-section", "children")  # Section 3: Inventory & Harvested Area
-    ],
-    [Input("year-dropdown", "value")]
-)
-def update_dashboard_wrapper(selected_year):
-    return update_dashboard(selected_year)
+    @numba.njit(parallel=True, cache=True)
+    def chunked_group_sum(codes, values, n_groups, n_chunks):
+        # Each chunk accumulates into its own row, so parallel iterations never write the same slot.
+        # Negative codes (missing keys) are skipped rather than wrapping around to the last group.
+        partial = np.zeros((n_chunks, n_groups))
+        chunk_size = (codes.size + n_chunks - 1) // n_chunks
+        for chunk in numba.prange(n_chunks):
+            for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, codes.size)):
+                if codes[i] >= 0:
+                    partial[chunk, codes[i]] += values[i]
+        return partial.sum(axis=0)
 
-def update_dashboard(selected_year):
-    # Load data
-    nitrogen_df, area_df, inventory_df, crop_df, animal_df, total_nitrogen_df = load_data(selected_year)
+    def group_sum(codes, values, n_groups):
+        return chunked_group_sum(codes, values, n_groups, numba.get_num_threads())
 
-    # Section 4: Nitrogen Loss Maps
-    nitrogen_loss_section = html.H2("In What Stage Is Nitrogen Lost in the Food and Animal Supply Chain?",
-                                    id="nitrogen-loss",
-                                    style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'})
 
-    nitrogen_loss_tabs = []
-    for i, (col, label) in enumerate(nitrogen_loss_labels.items()):
-        df = crop_df if i < 2 else animal_df
-        title = f"<b>{label}</b>"  # Bolded Title for Visualization
+def downcast(df):
+    dtypes = dict.fromkeys(df.select_dtypes('float64').columns, np.float32)
+    # int64 columns only shrink when every value fits, so out-of-range values are never wrapped
+    int_df = df.select_dtypes('int64')
+    int32 = np.iinfo(np.int32)
+    fits = (int_df.min() >= int32.min) & (int_df.max() <= int32.max)
+    dtypes.update(dict.fromkeys(int_df.columns[fits], np.int32))
+    return df.astype(dtypes)
 
-        df[f"log_{col}"] = np.log1p(df[col])  # Log transformation
 
-        fig = px.choropleth(
-            df, geojson="https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json",
-            locations="FIPS", color=f"log_{col}", hover_name="county",
-            hover_data={col: True},
-            labels={f"log_{col}": "Log Nitrogen Loss"},  # Ensuring correct label
-            title=title,  # Apply title
-            color_continuous_scale="Viridis", scope="usa"
-        )
+def display_commodities(commodities):
+    # Commodities form a small closed set: format each distinct name once and map the rows onto it
+    names = {name: name.replace('_', ' ').title() for name in commodities.dropna().unique()}
+    return commodities.map(names).astype('category')
 
-        fig.update_layout(
-            title={'text': title, 'x': 0.5, 'xanchor': 'center'},
-            margin={"r": 0, "t": 30, "l": 0, "b": 0},
-            paper_bgcolor="white",
-            plot_bgcolor="white"
-        )
-        fig.update_geos(fitbounds="locations")
-
-        # Use the corresponding nitrogen loss title for the tab
-        nitrogen_loss_tabs.append(dcc.Tab(label=label, children=[dcc.Graph(figure=fig)]))
-
-    # Total Nitrogen Loss Map
-    total_nitrogen_df["log_total_nitrogen_loss"] = np.log1p(total_nitrogen_df["total_nitrogen_loss"])
-
-    total_loss_fig = px.choropleth(
-        total_nitrogen_df,
-        geojson="https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json",
-        locations="FIPS", color="log_total_nitrogen_loss", hover_name="county",
-        hover_data={"total_nitrogen_loss": True},
-        title="<b>Total Nitrogen Loss by County</b>",  # Bolded title
-        labels={"log_total_nitrogen_loss": "Log Nitrogen Loss"},
-        color_continuous_scale="Viridis", scope="usa"
-    )
 
-    total_loss_fig.update_layout(
-        title={'text': "<b>Total Nitrogen Loss by County</b>", 'x': 0.5, 'xanchor': 'center'},
-        margin={"r": 0, "t": 30, "l": 0, "b": 0},
-        paper_bgcolor="white", plot_bgcolor="white"
-    )
-    total_loss_fig.update_geos(fitbounds="locations")
+def with_log_columns(df, cols):
+    # Build all log columns as one block and append it once, rather than inserting them one at a time
+    log_block = pd.DataFrame(np.log1p(df[cols].to_numpy(dtype=np.float32)),
+                             columns=[f"log_{col}" for col in cols], index=df.index)
+    return pd.concat([df, log_block], axis=1)
 
-    # Update tab label
-    nitrogen_loss_tabs.append(dcc.Tab(label="Total Nitrogen Loss", children=[dcc.Graph(figure=total_loss_fig)]))
 
-    # Nitrogen Loss Tabs Component
-    nitrogen_loss_tabbed_maps = dcc.Tabs(children=nitrogen_loss_tabs, style={'marginTop': '20px'})
-    maps = html.Div([nitrogen_loss_section, nitrogen_loss_tabbed_maps])
-
-    # Section 5: Nitrogen Loss Table
-    total_nitrogen_loss = round(
-        crop_df[['nitrogen_loss1', 'nitrogen_loss2']].sum().sum() / 10 ** 6 +
-        animal_df[['nitrogen_loss3', 'nitrogen_loss4', 'nitrogen_loss5', 'nitrogen_loss6', 'nitrogen_loss7']].sum().sum() / 10 ** 6,
-        2
-    )
-    nitrogen_loss_table = pd.DataFrame({
-        "Nitrogen Loss ID": [f"Nitrogen Loss Stage {i}" for i in range(1, 8)] + ["Total Nitrogen Loss"],
-        "Nitrogen Loss Type": list(nitrogen_loss_labels.values()) + ["Total Nitrogen Loss"],
-        "Total (K Tons)": (
-                round(crop_df[['nitrogen_loss1', 'nitrogen_loss2']].sum().div(10 ** 6), 2).tolist() +
-                round(animal_df[['nitrogen_loss3', 'nitrogen_loss4', 'nitrogen_loss5', 'nitrogen_loss6', 'nitrogen_loss7']].sum().div(10 ** 6), 2).tolist() +
-                [total_nitrogen_loss]
-        )
-    })
+# Function to load data based on selected year.
+# Cached per year: the returned DataFrames are shared between callbacks and must not be mutated.
+@lru_cache(maxsize=len(data_paths))
+def load_data(year):
+    path = data_paths[year]
+    # Reading CSV files (or their cached Parquet copies) with os.path.join
+    nitrogen_df = read_csv(os.path.join(path, 'nitrogen_losses_summary.csv'))
+    area_df = read_csv(os.path.join(path, 'harvested_area_by_commodity.csv'))
+    inventory_df = read_csv(os.path.join(path, 'inventory_by_commodity.csv'))
+    crop_processing_nitrogen_df = read_csv(os.path.join(path, 'crop_processing_nitrogen.csv'))
+    animal_stage_nitrogen_df = read_csv(os.path.join(path, 'animal_stage_nitrogen.csv'))
+    # Rename selfloop columns to within_county
+    crop_processing_nitrogen_df.rename(columns=crop_column_renames, inplace=True)
+    animal_stage_nitrogen_df.rename(columns=animal_column_renames, inplace=True)
+
+    # Commodity names as displayed in the charts and tables
+    area_df['Commodity'] = display_commodities(area_df['Commodity'])
+    inventory_df['Commodity'] = display_commodities(inventory_df['Commodity'])
+    crop_processing_nitrogen_df['commodity'] = display_commodities(crop_processing_nitrogen_df['commodity'])
+    animal_stage_nitrogen_df['commodity'] = display_commodities(animal_stage_nitrogen_df['commodity'])
+
+    # float32 is plenty for map colouring and halves the cached working set
+    crop_processing_nitrogen_df = downcast(crop_processing_nitrogen_df)
+    animal_stage_nitrogen_df = downcast(animal_stage_nitrogen_df)
+
+    # Calculate total nitrogen loss for each DataFrame by summing specified columns (missing values count as 0)
+    crop_processing_nitrogen_df['total_nitrogen_loss'] = np.nansum(
+        crop_processing_nitrogen_df[crop_nitrogen_cols].to_numpy(), axis=1)
+
+    animal_stage_nitrogen_df['total_nitrogen_loss'] = np.nansum(
+        animal_stage_nitrogen_df[animal_nitrogen_cols].to_numpy(), axis=1)
+
+    # Combine the total nitrogen loss from both dataframes: factorize FIPS once and sum per county in one pass
+    fips_all = pd.concat([crop_processing_nitrogen_df['FIPS'], animal_stage_nitrogen_df['FIPS']], ignore_index=True)
+    loss_all = np.concatenate([crop_processing_nitrogen_df['total_nitrogen_loss'].to_numpy(),
+                               animal_stage_nitrogen_df['total_nitrogen_loss'].to_numpy()])
+    codes, uniques = pd.factorize(fips_all, sort=True)
+    # Rows without a FIPS factorize to -1 and are left out, as groupby('FIPS') did
+    has_fips = codes >= 0
+    total_nitrogen_df = pd.DataFrame({'FIPS': uniques,
+                                      'total_nitrogen_loss': group_sum(codes[has_fips], loss_all[has_fips],
+                                                                       len(uniques))})
+
+    # Attach the first non-null county name of each FIPS
+    county_map = pd.concat([
+        crop_processing_nitrogen_df[['FIPS', 'county']],
+        animal_stage_nitrogen_df[['FIPS', 'county']]
+    ]).dropna(subset=['county']).drop_duplicates('FIPS')
+    total_nitrogen_df = total_nitrogen_df.merge(county_map, on='FIPS', how='left', validate='one_to_one')
+
+    # Log transformation of every column shown on a choropleth map
+    crop_processing_nitrogen_df = with_log_columns(crop_processing_nitrogen_df, crop_nitrogen_cols + crop_trade_cols)
+    animal_stage_nitrogen_df = with_log_columns(animal_stage_nitrogen_df,
+                                                animal_nitrogen_cols + animal_trade_cols + meat_trade_cols)
+    total_nitrogen_df = with_log_columns(total_nitrogen_df, ['total_nitrogen_loss'])
+
+    # Nitrogen loss totals for the summary table, summed in float64 so the rounded values stay exact
+    sums_crop = crop_processing_nitrogen_df[crop_nitrogen_cols].astype('float64').sum().to_numpy() / 10 ** 6
+    sums_animal = animal_stage_nitrogen_df[animal_nitrogen_cols].astype('float64').sum().to_numpy() / 10 ** 6
+    loss_totals = LossTotals(sums_crop, sums_animal, sums_crop.sum() + sums_animal.sum())
+
+    return YearData(nitrogen_df, area_df, inventory_df, crop_processing_nitrogen_df, animal_stage_nitrogen_df,
+                    total_nitrogen_df, loss_totals)
+
+
+# Keep only the Chesapeake Bay counties (any year) so each figure ships a fraction of the US GeoJSON
+bay_fips = set()
+for year in data_paths:
+    bay_fips.update(load_data(year).total_nitrogen_df['FIPS'])
+bay_geojson = {
+    'type': 'FeatureCollection',
+    'features': [feature for feature in counties_geojson['features'] if feature['id'] in bay_fips]
+}
 
-    nitrogen_loss_table_component = dash_table.DataTable(
-        data=nitrogen_loss_table.to_dict("records"),
-        columns=[{"name": col, "id": col} for col in nitrogen_loss_table.columns],
-        style_header={'fontWeight': 'bold', 'textAlign': 'center'},
-        style_cell={'textAlign': 'center'},
-        style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgba(248, 248, 248, 0.9)'}]
-    )
 
-    # Section 6: Where Does Nitrogen Loss Occur?
-    nitrogen_loss_location_heading = html.H2("Where Does Nitrogen Loss Occur in the Chesapeake Bay?",
-                                             id="trade-behavior",
-                                             style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'})
+@lru_cache(maxsize=len(data_paths))
+def state_nitrogen_totals(year):
+    year_data = load_data(year)
+    total_nitrogen_df = year_data.total_nitrogen_df
 
-    # Section 6: Where Does Nitrogen Loss Occur?
-    nitrogen_loss_location_heading = html.H2(
-        "Where Does Nitrogen Loss Occur in the Chesapeake Bay?",
-        id="trade-behavior",
-        style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'}
+    # Aggregate the county totals by the state part of the FIPS code. The data only covers
+    # Chesapeake Bay counties, so each state total is the sum of that state's Bay counties.
+    state_df = (total_nitrogen_df.assign(state_fips=total_nitrogen_df['FIPS'].str[:2])
+                .groupby('state_fips', as_index=False)['total_nitrogen_loss'].sum()
+                .rename(columns={'total_nitrogen_loss': 'state_total_nitrogen_loss'}))
+    state_names = (year_data.crop_df[['FIPS', 'state']].dropna()
+                   .assign(state_fips=lambda df: df['FIPS'].str[:2])
+                   .drop_duplicates('state_fips')[['state_fips', 'state']])
+    state_df = state_df.merge(state_names, on='state_fips', how='left')
+    state_df['state_code'] = state_df['state_fips'].map(state_postal_codes)
+    state_df['state'] = state_df['state'].str.title().fillna(state_df['state_code'])
+    return with_log_columns(state_df, ['state_total_nitrogen_loss'])
+
+
+def map_frames(year):
+    year_data = load_data(year)
+    return {'crop': year_data.crop_df, 'animal': year_data.animal_df, 'total': year_data.total_nitrogen_df,
+            'state': state_nitrogen_totals(year)}
+
+
+# Choropleth figures keyed by (year, column), stored as plain dicts so cache hits skip plotly validation
+figure_cache = {}
+
+
+# Layout shared by every choropleth; only the title varies per figure
+choropleth_layout = {
+    'margin': {"r": 0, "t": 30, "l": 0, "b": 0},
+    'paper_bgcolor': "white",
+    'plot_bgcolor': "white",
+    'geo': {'scope': "usa", 'fitbounds': "locations"}
+}
+
+
+def build_choropleth(df, col, source, title, colorbar_title):
+    location_col, name_col = map_location_cols[source]
+    # Counties are drawn from the Bay GeoJSON, states from plotly's built-in outlines
+    if source == 'state':
+        geometry, location_label, value_label = {'locationmode': "USA-states"}, "State", "Bay-county total"
+    else:
+        geometry, location_label, value_label = {'geojson': bay_geojson}, "FIPS", col
+    return go.Figure(
+        data=[go.Choropleth(
+            **geometry,
+            locations=df[location_col].to_numpy(),
+            z=df[f"log_{col}"].to_numpy(),
+            text=df[name_col].to_numpy(),
+            customdata=df[col].to_numpy(),
+            hovertemplate=(f"<b>%{{text}}</b><br><br>{location_label}=%{{location}}<br>{value_label}=%{{customdata}}"
+                           f"<br>{colorbar_title}=%{{z}}<extra></extra>"),
+            colorscale="Viridis",
+            colorbar={'title': {'text': colorbar_title}}
+        )],
+        layout={**choropleth_layout, 'title': {'text': title, 'x': 0.5, 'xanchor': 'center'}}
     )
 
-    # Import/Export Tabs with Corresponding Tables
-    import_export_sections = []
-    for idx, stage in enumerate(["Crop Stage", "Live Animal Stage", "Animal Product Stage"]):
-        stage_df = [crop_df, animal_df, animal_df][idx]
-        columns = [
-            ["import_crop_processing_nitrogen", "export_crop_processing_nitrogen",
-             "within_county_crop_processing_nitrogen"],
-            ["import_animal_nitrogen", "export_animal_nitrogen", "within_county_animal_nitrogen"],
-            ["import_meat_nitrogen", "export_meat_nitrogen", "within_county_meat_nitrogen"]
-        ][idx]
 
-        # Section Heading (Centered)
-        stage_heading = html.H3(
-            stage,
-            style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '30px'}
-        )
+# Default year shown when the page loads
+default_year = '2017'
+
+# Supply chain stages of the trade section with their Import/Export/Within County columns
+trade_stages = [
+    ("Crop Stage", crop_trade_cols),
+    ("Live Animal Stage", animal_trade_cols),
+    ("Animal Product Stage", meat_trade_cols)
+]
+
+# Source DataFrame of every choropleth column
+map_sources = {
+    **dict.fromkeys(crop_nitrogen_cols + crop_trade_cols, 'crop'),
+    **dict.fromkeys(animal_nitrogen_cols + animal_trade_cols + meat_trade_cols, 'animal'),
+    'total_nitrogen_loss': 'total',
+    'state_total_nitrogen_loss': 'state'
+}
 
-        # List to store map tabs for Import/Export/Within County
-        stage_tabs = []
-        for col in columns:
-            stage_df[f"log_{col}"] = np.log1p(stage_df[col])  # Log transformation
+# Location and hover name columns of each choropleth source
+map_location_cols = {'crop': ('FIPS', 'county'), 'animal': ('FIPS', 'county'), 'total': ('FIPS', 'county'),
+                     'state': ('state_code', 'state')}
 
-            fig = px.choropleth(
-                stage_df, geojson="https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json",
-                locations="FIPS", color=f"log_{col}", hover_name="county",
-                hover_data={col: True}, title=f"<b>{col.replace('_', ' ').title()} - {stage}<b>",  # Bold Title
-                color_continuous_scale="Viridis", scope="usa"
-            )
 
-            fig.update_layout(
-                title={'text': f"<b>{col.replace('_', ' ').title()} - {stage}<b>", 'x': 0.5, 'xanchor': 'center'},
-                margin={"r": 0, "t": 30, "l": 0, "b": 0},
-                paper_bgcolor="white", plot_bgcolor="white"
-            )
+# Title and colorbar title of every choropleth
+map_titles = {
+    **{col: (f"<b>{label}</b>", "Log Nitrogen Loss") for col, label in nitrogen_loss_labels.items()},
+    'total_nitrogen_loss': ("<b>Total Nitrogen Loss by County</b>", "Log Nitrogen Loss"),
+    'state_total_nitrogen_loss': ("<b>Bay-County Total Nitrogen Loss by State</b> (zoom in for counties)",
+                                  "Log Nitrogen Loss"),
+    **{col: (f"<b>{col.replace('_', ' ').title()} - {stage}<b>", "Log Nitrogen")
+       for stage, columns in trade_stages for col in columns}
+}
 
-            fig.update_coloraxes(colorbar_title="Log Nitrogen")
-            fig.update_geos(fitbounds="locations")
 
-            stage_tabs.append(dcc.Tab(label=col.replace('_', ' ').title(), children=[dcc.Graph(figure=fig)]))
+def map_figure(year, col):
+    key = (year, col)
+    if key not in figure_cache:
+        source = map_sources[col]
+        title, colorbar_title = map_titles[col]
+        figure_cache[key] = build_choropleth(map_frames(year)[source], col, source, title, colorbar_title).to_dict()
+    return figure_cache[key]
 
-        # Create Table for this Stage
-        table_data = stage_df.groupby("commodity")[[columns[0], columns[1], columns[2]]].sum().reset_index()
 
-        # Convert values to millions and round to 2 decimal places
-        table_data[columns] = round(table_data[columns].div(10 ** 6), 2)
+def map_graph(year, col):
+    # The total nitrogen loss map opens on the state overview and switches to counties on zoom
+    figure_col = 'state_total_nitrogen_loss' if col == 'total_nitrogen_loss' else col
+    return dcc.Graph(id={'type': 'choropleth', 'index': col}, figure=map_figure(year, figure_col))
 
-        # Format commodity names
-        table_data["commodity"] = table_data["commodity"].str.title().str.replace('_', ' ')
 
-        # Rename columns for clarity
-        table_data.columns = ["Commodity", "Import (K Tons)", "Export (K Tons)", "Within County (K Tons)"]
+# Geo projection scale from which the total nitrogen loss map shows counties instead of states
+county_zoom_scale = 4
 
-        # Create Dash DataTable
-        stage_table = dash_table.DataTable(
-            data=table_data.to_dict("records"),
-            columns=[{"name": col, "id": col} for col in table_data.columns],
-            style_header={'fontWeight': 'bold', 'textAlign': 'center'},
-            style_cell={'textAlign': 'center'},
-            style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgba(248, 248, 248, 0.9)'}]
+
+@lru_cache(maxsize=len(data_paths))
+@cache.memoize()
+def nitrogen_loss_table_records(year):
+    loss_totals = load_data(year).loss_totals
+    nitrogen_loss_table = pd.DataFrame({
+        "Nitrogen Loss ID": [f"Nitrogen Loss Stage {i}" for i in range(1, 8)] + ["Total Nitrogen Loss"],
+        "Nitrogen Loss Type": list(nitrogen_loss_labels.values()) + ["Total Nitrogen Loss"],
+        "Total (K Tons)": (
+                np.round(loss_totals.crop, 2).tolist() +
+                np.round(loss_totals.animal, 2).tolist() +
+                [round(loss_totals.total, 2)]
         )
+    })
+    return nitrogen_loss_table.to_dict("records")
 
-        # Wrap everything for this stage inside a div
-        stage_section = html.Div([
-            stage_heading,
-            dcc.Tabs(children=stage_tabs),
-            html.Br(),
-            html.Div(stage_table, style={'width': '80%', 'margin': '0 auto'})  # Centered Table
-        ], style={'padding': '20px'})
 
-        import_export_sections.append(stage_section)
+@lru_cache(maxsize=len(data_paths))
+@cache.memoize()
+def trade_table_records(year):
+    year_data = load_data(year)
 
-    # Wrap all sections inside a container
-    import_export_content = html.Div(
-        [nitrogen_loss_location_heading] + import_export_sections,
-        style={'width': '90%', 'margin': '0 auto'}
-    )
+    # One aggregation per source DataFrame; both animal stages are sliced from the same result.
+    # Each frame is narrowed to the grouped columns first so the groupby never copies the rest.
+    crop_trade_df = year_data.crop_df[["commodity", *crop_trade_cols]]
+    animal_trade_df = year_data.animal_df[["commodity", *animal_trade_cols, *meat_trade_cols]]
+    crop_totals = crop_trade_df.groupby("commodity", observed=True).sum(engine=groupby_engine)
+    animal_totals = animal_trade_df.groupby("commodity", observed=True).sum(engine=groupby_engine)
 
-    # Section 7: Production Totals (Inventory & Harvested Area)
-    production_totals_heading = html.H2("What Are the Production Totals for Crops and Animals in the Chesapeake Bay?",
-                                        id="area-inventory",
-                                        style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'})
+    records = []
+    for idx, (stage, columns) in enumerate(trade_stages):
+        table_data = [crop_totals, animal_totals, animal_totals][idx][columns].reset_index()
 
-    # Ensure "Commodity" column is formatted properly
-    if "Commodity" in inventory_df.columns:
-        inventory_df["Commodity"] = inventory_df["Commodity"].str.title().str.replace("_", " ")
-    if "Commodity" in area_df.columns:
-        area_df["Commodity"] = area_df["Commodity"].str.title().str.replace("_", " ")
+        # Convert values to millions and round to 2 decimal places, in float64 so float32 sums round exactly
+        table_data[columns] = round(table_data[columns].astype('float64').div(10 ** 6), 2)
+
+        # Rename columns for clarity
+        table_data.columns = ["Commodity", "Import (K Tons)", "Export (K Tons)", "Within County (K Tons)"]
+        records.append(table_data.to_dict("records"))
+    return records
+
+
+@lru_cache(maxsize=len(data_paths))
+@cache.memoize()
+def production_totals(year):
+    year_data = load_data(year)
+    area_df, inventory_df = year_data.area_df, year_data.inventory_df
 
     # Define consistent color scheme
     viridis_colors = px.colors.sequential.Viridis
@@ -364,42 +488,317 @@ def update_dashboard(selected_year):
     area_df = area_df.round(2)
     inventory_df = inventory_df.round(2)
 
-    # Create Inventory table
-    inventory_table = dash_table.DataTable(
-        data=inventory_df.to_dict("records"),
-        columns=[{"name": col, "id": col} for col in inventory_df.columns],
+    return (inventory_chart.to_dict(), area_chart.to_dict(),
+            inventory_df.to_dict("records"), area_df.to_dict("records"))
+
+
+def map_trace_data(year):
+    # Per-year choropleth arrays for the browser: FIPS and county names once per source DataFrame,
+    # colour values and hover values per column
+    frames = map_frames(year)
+    return {
+        'sources': {name: {'locations': df[map_location_cols[name][0]].to_numpy(),
+                           'text': df[map_location_cols[name][1]].to_numpy()}
+                    for name, df in frames.items()},
+        'maps': {col: {'source': source, 'z': frames[source][f"log_{col}"].to_numpy(),
+                       'customdata': frames[source][col].to_numpy()}
+                 for col, source in map_sources.items()}
+    }
+
+
+def figure_data_patch(fig, keys):
+    # Only the trace arrays change between years; the layout stays in the browser
+    patch = Patch()
+    for key in keys:
+        patch['data'][0][key] = fig['data'][0][key]
+    return patch
+
+
+pie_keys = ('labels', 'values')
+
+
+def lazy_map_tabs(section, tabs, **tabs_kwargs):
+    # Only the selected tab's map is sent with the page; the others are loaded the first time they are selected
+    selected = tabs[0][0]
+    return html.Div([
+        dcc.Tabs(
+            id={'type': 'map-tabs', 'section': section},
+            value=selected,
+            persistence=True,
+            children=[
+                dcc.Tab(label=label, value=col, id={'type': 'map-tab', 'section': section, 'index': col},
+                        children=[map_graph(default_year, col)] if col == selected else [])
+                for col, label in tabs
+            ],
+            **tabs_kwargs
+        ),
+        dcc.Store(id={'type': 'loaded-map-tabs', 'section': section}, data=[selected])
+    ])
+
+
+def styled_table(table_id, records):
+    return dash_table.DataTable(
+        id=table_id,
+        data=records,
+        columns=[{"name": col, "id": col} for col in records[0]],
         style_header={'fontWeight': 'bold', 'textAlign': 'center'},
         style_cell={'textAlign': 'center'},
         style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgba(248, 248, 248, 0.9)'}]
     )
 
-    # Create Harvested Area table
-    area_table = dash_table.DataTable(
-        data=area_df.to_dict("records"),
-        columns=[{"name": col, "id": col} for col in area_df.columns],
-        style_header={'fontWeight': 'bold', 'textAlign': 'center'},
-        style_cell={'textAlign': 'center'},
-        style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': 'rgba(248, 248, 248, 0.9)'}]
+
+def nitrogen_loss_maps_section():
+    # Section 4: Nitrogen Loss Maps
+    nitrogen_loss_section = html.H2("In What Stage Is Nitrogen Lost in the Food and Animal Supply Chain?",
+                                    id="nitrogen-loss",
+                                    style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'})
+
+    # Use the corresponding nitrogen loss title for each tab
+    nitrogen_loss_tabs = list(nitrogen_loss_labels.items()) + [("total_nitrogen_loss", "Total Nitrogen Loss")]
+
+    # Nitrogen Loss Tabs Component
+    nitrogen_loss_tabbed_maps = lazy_map_tabs("nitrogen-loss", nitrogen_loss_tabs, style={'marginTop': '20px'})
+    return html.Div([nitrogen_loss_section, nitrogen_loss_tabbed_maps])
+
+
+def trade_section():
+    # Section 6: Where Does Nitrogen Loss Occur?
+    nitrogen_loss_location_heading = html.H2(
+        "Where Does Nitrogen Loss Occur in the Chesapeake Bay?",
+        id="trade-behavior",
+        style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'}
     )
 
+    # Import/Export Tabs with Corresponding Tables
+    import_export_sections = []
+    for idx, ((stage, columns), records) in enumerate(zip(trade_stages, trade_table_records(default_year))):
+        # Section Heading (Centered)
+        stage_heading = html.H3(
+            stage,
+            style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '30px'}
+        )
+
+        # Map tabs for Import/Export/Within County
+        stage_tabs = [(col, col.replace('_', ' ').title()) for col in columns]
+
+        # Wrap everything for this stage inside a div
+        stage_section = html.Div([
+            stage_heading,
+            lazy_map_tabs(f"trade-{idx}", stage_tabs),
+            html.Br(),
+            html.Div(styled_table(f"trade-table-{idx}", records),
+                     style={'width': '80%', 'margin': '0 auto'})  # Centered Table
+        ], style={'padding': '20px'})
+
+        import_export_sections.append(stage_section)
+
+    # Wrap all sections inside a container
+    return html.Div(
+        [nitrogen_loss_location_heading] + import_export_sections,
+        style={'width': '90%', 'margin': '0 auto'}
+    )
+
+
+def inventory_harvest_section():
+    # Section 7: Production Totals (Inventory & Harvested Area)
+    production_totals_heading = html.H2("What Are the Production Totals for Crops and Animals in the Chesapeake Bay?",
+                                        id="area-inventory",
+                                        style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'})
+
+    inventory_chart, area_chart, inventory_records, area_records = production_totals(default_year)
+
     # Inventory & Harvested Area Section (Tabs)
-    inventory_harvest_section = html.Div([
+    return html.Div([
         production_totals_heading,
         dcc.Tabs(children=[
             dcc.Tab(label="Inventory", children=[
-                dcc.Graph(figure=inventory_chart, style={'width': '70%', 'margin': '0 auto'}),
+                dcc.Graph(id="inventory-chart", figure=inventory_chart, style={'width': '70%', 'margin': '0 auto'}),
                 html.Br(),
-                inventory_table
+                styled_table("inventory-table", inventory_records)
             ]),
             dcc.Tab(label="Harvested Area", children=[
-                dcc.Graph(figure=area_chart, style={'width': '70%', 'margin': '0 auto'}),
+                dcc.Graph(id="area-chart", figure=area_chart, style={'width': '70%', 'margin': '0 auto'}),
                 html.Br(),
-                area_table
+                styled_table("area-table", area_records)
             ])
         ])
     ])
 
-    return maps, nitrogen_loss_table_component, import_export_content, [], inventory_harvest_section
+
+# The page is rendered for the default year; the callbacks below only send what changes with the year
+app.layout = html.Div([
+    # Title
+    html.H1(
+        [
+            html.Span("Impacts of Future Scenarios on Nitrogen Loss from Agricultural Supply Chains",
+                      style={'display': 'block'}),
+            html.Span("in the Chesapeake Bay",
+                      style={'display': 'block'})
+        ],
+        style={'textAlign': 'center', 'fontWeight': 'bold'}
+    ),
+
+    # Text with hyperlink to paper
+    html.P([
+        "The Dashboard has been modeled based on this ",
+        html.A("paper", href="https://www.DOI.org/10.1088/1748-9326/ad5d0b", target="_blank",
+               style={'color': 'blue', 'textDecoration': 'underline'}),
+        "."
+    ], style={'textAlign': 'center', 'fontSize': '16px', 'marginTop': '20px'}),
+
+    # Dropdown for Year Selection
+    html.Label(
+        'Select Year',
+        style={'fontWeight': 'bold', 'textAlign': 'center', 'display': 'block', 'marginTop': '20px'}
+    ),
+    dcc.Dropdown(
+        id='year-dropdown',
+        options=[{'label': year, 'value': year} for year in data_paths.keys()],
+        value=default_year,
+        style={'width': '50%', 'margin': '0 auto'}
+    ),
+
+    # Choropleth arrays of every year, so switching years redraws the maps without a server round-trip
+    dcc.Store(id='map-traces', data={year: map_trace_data(year) for year in data_paths}),
+
+    # Layer currently drawn on the total nitrogen loss map: 'state' or 'county'
+    dcc.Store(id='total-map-layer', data='state'),
+
+    # Table of Contents
+    html.H2("Contents", style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '40px'}),
+    html.Ul([
+        html.Li(html.Span("In What Stage Is Nitrogen Lost in the Food and Animal Supply Chain?",
+                          style={'fontWeight': 'bold', 'fontSize': '18px'})),
+        html.Li(html.Span("Where Does Nitrogen Loss Occur in the Chesapeake Bay?",
+                          style={'fontWeight': 'bold', 'fontSize': '18px'})),
+        html.Li(html.Span("What Are the Production Totals for Crops and Animals in the Chesapeake Bay?",
+                          style={'fontWeight': 'bold', 'fontSize': '18px'}))
+    ], style={'textAlign': 'center', 'listStyleType': 'none', 'padding': 0}),
+
+    # Section 1: Nitrogen Loss Maps (Tabs)
+    html.Div(nitrogen_loss_maps_section(), id="chloropleth-maps"),
+
+    # Section 1.1: Nitrogen Loss Table
+    html.H2("Nitrogen Loss Table",
+            style={'textAlign': 'center', 'fontWeight': 'bold', 'marginTop': '20px'}),
+    html.Div(styled_table("nitrogen-loss-table-data", nitrogen_loss_table_records(default_year)),
+             id="nitrogen-loss-table",
+             style={'width': '80%', 'margin': '0 auto'}),
+
+    # Section 2: Trade Behavior Maps (Tabs) & Tables
+    html.Div(trade_section(), id="import-export-tables",
+             style={'width': '80%', 'margin': '0 auto'}),
+
+    # Section 3: Inventory & Harvested Area (Tabs)
+    html.Div(inventory_harvest_section(), id="inventory-harvest-section")
+], style={'padding': '20px'})
+
+
+# Section 1 & 2: Nitrogen Loss and Trade Behavior Maps
+app.clientside_callback(
+    """
+    function(year, traces, figure, id) {
+        const layer = figure.data[0].locationmode === 'USA-states' ? 'state_' : '';
+        const map = traces[year].maps[layer + id.index];
+        const source = traces[year].sources[map.source];
+        const trace = Object.assign({}, figure.data[0], {
+            locations: source.locations, text: source.text, z: map.z, customdata: map.customdata
+        });
+        return Object.assign({}, figure, {data: [trace]});
+    }
+    """,
+    Output({'type': 'choropleth', 'index': MATCH}, 'figure'),
+    Input('year-dropdown', 'value'),
+    State('map-traces', 'data'),
+    State({'type': 'choropleth', 'index': MATCH}, 'figure'),
+    State({'type': 'choropleth', 'index': MATCH}, 'id'),
+    prevent_initial_call=True
+)
+
+
+# Section 1 & 2: Map tabs, loaded on first selection
+@app.callback(
+    Output({'type': 'map-tab', 'section': MATCH, 'index': ALL}, 'children'),
+    Output({'type': 'loaded-map-tabs', 'section': MATCH}, 'data'),
+    Input({'type': 'map-tabs', 'section': MATCH}, 'value'),
+    State({'type': 'loaded-map-tabs', 'section': MATCH}, 'data'),
+    State({'type': 'map-tab', 'section': MATCH, 'index': ALL}, 'id'),
+    State('year-dropdown', 'value')
+)
+def load_map_tab(selected_tab, loaded_tabs, tab_ids, selected_year):
+    if selected_tab in loaded_tabs:
+        raise PreventUpdate
+    # Later year changes reach the new map through the clientside callback above
+    children = [[map_graph(selected_year, tab_id['index'])] if tab_id['index'] == selected_tab else dash.no_update
+                for tab_id in tab_ids]
+    return children, loaded_tabs + [selected_tab]
+
+
+# Section 1: Total Nitrogen Loss map, states until zoomed in past county_zoom_scale
+@app.callback(
+    Output({'type': 'choropleth', 'index': 'total_nitrogen_loss'}, 'figure', allow_duplicate=True),
+    Output('total-map-layer', 'data'),
+    Input({'type': 'choropleth', 'index': 'total_nitrogen_loss'}, 'relayoutData'),
+    State('total-map-layer', 'data'),
+    State('year-dropdown', 'value'),
+    prevent_initial_call=True
+)
+def switch_total_map_layer(relayout_data, layer, selected_year):
+    scale = (relayout_data or {}).get('geo.projection.scale')
+    if scale is None:
+        raise PreventUpdate
+    new_layer = 'county' if scale >= county_zoom_scale else 'state'
+    if new_layer == layer:
+        raise PreventUpdate
+
+    fig = map_figure(selected_year, 'total_nitrogen_loss' if new_layer == 'county' else 'state_total_nitrogen_loss')
+    # Swap the trace and title but keep the user's current zoom and center
+    patch = Patch()
+    patch['data'] = fig['data']
+    patch['layout']['title'] = fig['layout']['title']
+    patch['layout']['geo']['fitbounds'] = False
+    patch['layout']['geo']['projection']['scale'] = scale
+    for axis in ('lon', 'lat'):
+        if f'geo.center.{axis}' in relayout_data:
+            patch['layout']['geo']['center'][axis] = relayout_data[f'geo.center.{axis}']
+    return patch, new_layer
+
+
+# Section 1.1: Nitrogen Loss Table
+@app.callback(
+    Output("nitrogen-loss-table-data", "data"),
+    Input("year-dropdown", "value"),
+    prevent_initial_call=True
+)
+def update_nitrogen_loss_table(selected_year):
+    return nitrogen_loss_table_records(selected_year)
+
+
+# Section 2.1: Trade Behavior Tables
+@app.callback(
+    [Output(f"trade-table-{idx}", "data") for idx in range(len(trade_stages))],
+    Input("year-dropdown", "value"),
+    prevent_initial_call=True
+)
+def update_trade_tables(selected_year):
+    return trade_table_records(selected_year)
+
+
+# Section 3: Inventory & Harvested Area
+@app.callback(
+    [
+        Output("inventory-chart", "figure"),
+        Output("area-chart", "figure"),
+        Output("inventory-table", "data"),
+        Output("area-table", "data")
+    ],
+    Input("year-dropdown", "value"),
+    prevent_initial_call=True
+)
+def update_inventory_harvest(selected_year):
+    inventory_chart, area_chart, inventory_records, area_records = production_totals(selected_year)
+    return (figure_data_patch(inventory_chart, pie_keys), figure_data_patch(area_chart, pie_keys),
+            inventory_records, area_records)
 
 
 if __name__ == "__main__":